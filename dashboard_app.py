@@ -13,7 +13,7 @@ import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, timedelta
-import time
+import os
 import numpy as np
 
 # ============================================================
@@ -28,7 +28,7 @@ st.set_page_config(
 )
 
 # CSS personnalisé
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -74,34 +74,65 @@ st.markdown("""
         margin: 0.5rem 0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource
+def inject_css():
+    """Injecte le CSS personnalisé (appel mis en cache puis rejoué par Streamlit)"""
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
+inject_css()
 
 # ============================================================
 # CHARGEMENT DES DONNÉES
 # ============================================================
 
+# Types compacts appliqués à la lecture CSV (identiques à ceux du générateur)
+CSV_DTYPES = {
+    'inlet_flow_lph': 'float32',
+    'post_treatment_flow_lph': 'float32',
+    'rinse_flow_lph': 'float32',
+    'cip_flow_lph': 'float32',
+    'production_lph': 'float32',
+    'conductivity_uS_cm': 'float32',
+    'turbidity_NTU': 'float32',
+    'temperature_C': 'float32',
+    'wur': 'float32',
+    'cip_active': 'int8',
+    'shift': 'category',
+    'line_status': 'category'
+}
+
 @st.cache_data
 def load_data(scenario):
-    """Charge le dataset correspondant au scénario"""
+    """Charge le dataset correspondant au scénario (Parquet si disponible, sinon CSV)"""
+    parquet_filename = f"{scenario}.parquet"
+    if os.path.exists(parquet_filename):
+        return pd.read_parquet(parquet_filename)
+    
     try:
         filename = f"{scenario}.csv"
-        df = pd.read_csv(filename, parse_dates=['timestamp'])
+        df = pd.read_csv(filename, dtype=CSV_DTYPES)
+        # Format fixé par export_dataset (generate_data.py) : évite l'inférence de format date par date
+        df['timestamp'] = pd.to_datetime(df['timestamp'], format='%Y-%m-%d %H:%M:%S', cache=True)
         return df
     except FileNotFoundError:
         st.error(f"❌ Fichier {filename} introuvable. Veuillez d'abord exécuter generate_data.py")
         st.stop()
 
 @st.cache_data
-def get_daily_aggregates(df):
-    """Calcule les agrégations quotidiennes"""
-    df['date'] = df['timestamp'].dt.date
-    daily = df.groupby('date').agg({
-        'inlet_flow_lph': 'sum',
-        'production_lph': 'sum',
-        'wur': 'mean',
-        'rinse_flow_lph': 'sum',
-        'cip_flow_lph': 'sum'
-    }).reset_index()
+def get_daily_aggregates(scenario):
+    """Calcule les agrégations quotidiennes du scénario"""
+    df = load_data(scenario)
+    
+    # Clé jour datetime64[D] (entiers) : pas de colonne d'objets date ni de mutation de df
+    day_key = df['timestamp'].to_numpy().astype('datetime64[D]')
+    grouped = df.groupby(day_key, sort=False)
+    
+    # Un seul groupement partagé par les sommes et la moyenne
+    daily = grouped[['inlet_flow_lph', 'production_lph', 'rinse_flow_lph', 'cip_flow_lph']].sum()
+    daily['wur'] = grouped['wur'].mean()
+    daily = daily.rename_axis('date').reset_index()
     
     daily['inlet_flow_m3'] = daily['inlet_flow_lph'] / 1000
     daily['production_L'] = daily['production_lph']
@@ -112,30 +143,34 @@ def get_daily_aggregates(df):
 # DÉTECTION D'ALERTES
 # ============================================================
 
-def detect_alerts(df_current):
-    """Détecte les alertes sur les données actuelles"""
+def detect_alerts(current, baseline_inlet):
+    """
+    Détecte les alertes sur le point courant
+    current : valeurs du point courant (wur, inlet_flow_lph, rinse_flow_lph, timestamp)
+    baseline_inlet : débit d'entrée moyen sur l'heure précédente (12 points), NaN si < 1h
+    """
     alerts = []
+    current_wur = current['wur']
     
     # Alerte WUR élevé
-    if df_current['wur'].iloc[-1] > 1.85:
+    if current_wur > 1.85:
         alerts.append({
             'type': 'WUR Critique',
             'severity': 'HIGH',
-            'message': f"WUR actuel : {df_current['wur'].iloc[-1]:.2f} L/L (> 1.85)",
-            'time': df_current['timestamp'].iloc[-1]
+            'message': f"WUR actuel : {current_wur:.2f} L/L (> 1.85)",
+            'time': current['timestamp']
         })
-    elif df_current['wur'].iloc[-1] > 1.70:
+    elif current_wur > 1.70:
         alerts.append({
             'type': 'WUR Élevé',
             'severity': 'MEDIUM',
-            'message': f"WUR actuel : {df_current['wur'].iloc[-1]:.2f} L/L (> 1.70)",
-            'time': df_current['timestamp'].iloc[-1]
+            'message': f"WUR actuel : {current_wur:.2f} L/L (> 1.70)",
+            'time': current['timestamp']
         })
     
     # Alerte débit anormal (fuite potentielle)
-    if len(df_current) > 12:  # Au moins 1h de données
-        baseline_inlet = df_current['inlet_flow_lph'].iloc[-13:-1].mean()
-        current_inlet = df_current['inlet_flow_lph'].iloc[-1]
+    if not np.isnan(baseline_inlet):  # Au moins 1h de données
+        current_inlet = current['inlet_flow_lph']
         deviation = ((current_inlet - baseline_inlet) / baseline_inlet) * 100
         
         if deviation > 15:
@@ -143,20 +178,117 @@ def detect_alerts(df_current):
                 'type': 'Fuite Suspectée',
                 'severity': 'HIGH',
                 'message': f"Débit entrée +{deviation:.1f}% vs moyenne (fuite possible)",
-                'time': df_current['timestamp'].iloc[-1]
+                'time': current['timestamp']
             })
     
     # Alerte sur-rinçage
-    if df_current['rinse_flow_lph'].iloc[-1] > 250:
+    if current['rinse_flow_lph'] > 250:
         alerts.append({
             'type': 'Sur-rinçage',
             'severity': 'MEDIUM',
-            'message': f"Débit rinçage : {df_current['rinse_flow_lph'].iloc[-1]:.0f} L/h (> 250)",
-            'time': df_current['timestamp'].iloc[-1]
+            'message': f"Débit rinçage : {current['rinse_flow_lph']:.0f} L/h (> 250)",
+            'time': current['timestamp']
         })
     
     return alerts
 
+# ============================================================
+# INDICATEURS DÉRIVÉS (mis en cache par scénario et position)
+# ============================================================
+
+# Les fonctions ci-dessous ne reçoivent que des arguments primitifs
+# (scénario, index) : Streamlit n'a pas à hacher de DataFrame.
+# Les tableaux précalculés sont en lecture seule : cache_resource les partage
+# sans la désérialisation qu'impose cache_data à chaque appel.
+
+@st.cache_resource
+def precompute_indicators(scenario):
+    """Précalcule une fois par scénario les colonnes brutes, cumuls et fenêtres glissantes"""
+    df = load_data(scenario)
+    
+    # Cumuls préfixés d'un zéro : somme sur [a, b] = cum[b + 1] - cum[a]
+    # (accumulateur float64 : les colonnes sont stockées en float32)
+    def prefixed_cumsum(column):
+        return np.concatenate(([0.0], df[column].to_numpy().cumsum(dtype=np.float64)))
+    
+    # Indice du premier point de la journée de chaque point
+    day_id = df['timestamp'].to_numpy().astype('datetime64[D]')
+    
+    return {
+        'timestamp': df['timestamp'].to_numpy(),
+        'wur': df['wur'].to_numpy(),
+        'inlet': df['inlet_flow_lph'].to_numpy(),
+        'rinse': df['rinse_flow_lph'].to_numpy(),
+        'inlet_cum': prefixed_cumsum('inlet_flow_lph'),
+        'prod_cum': prefixed_cumsum('production_lph'),
+        'wur_cum': prefixed_cumsum('wur'),
+        'day_start': np.searchsorted(day_id, day_id, side='left'),
+        # Positions (triées) des points en CIP, pour les marqueurs du graphique
+        'cip_idx': np.flatnonzero(df['cip_active'].to_numpy()),
+        'wur_24h_mean': df['wur'].rolling(288).mean().to_numpy(),
+        'wur_24h_min': df['wur'].rolling(288).min().to_numpy(),
+        'wur_24h_max': df['wur'].rolling(288).max().to_numpy(),
+        # Moyenne du débit d'entrée sur les 12 points précédents (exclut le point courant)
+        'inlet_rolling12': df['inlet_flow_lph'].rolling(12).mean().shift(1).to_numpy(),
+    }
+
+@st.cache_resource
+def compute_savings_curve(scenario):
+    """Économie d'eau cumulée vs baseline (m³ et %) pour chaque position"""
+    baseline_water = precompute_indicators("baseline")['inlet_cum'][1:] / 1000
+    current_water = precompute_indicators(scenario)['inlet_cum'][1:] / 1000
+    savings = baseline_water - current_water
+    return savings, savings / baseline_water * 100
+
+@st.cache_data(max_entries=512)
+def compute_kpis(scenario, idx):
+    """Calcule les KPIs principaux à la position idx"""
+    ind = precompute_indicators(scenario)
+    day_start = ind['day_start'][idx]
+    
+    kpis = {
+        'current_wur': ind['wur'][idx],
+        'water_today': (ind['inlet_cum'][idx + 1] - ind['inlet_cum'][day_start]) / 1000,
+        'prod_today': ind['prod_cum'][idx + 1] - ind['prod_cum'][day_start],
+        'avg_wur': ind['wur_cum'][idx + 1] / (idx + 1),
+    }
+    
+    if scenario == "optimized":
+        # Comparer avec baseline
+        savings, savings_pct = compute_savings_curve(scenario)
+        kpis['savings'] = savings[idx]
+        kpis['savings_pct'] = savings_pct[idx]
+    
+    return kpis
+
+@st.cache_data(max_entries=512)
+def compute_alerts(scenario, idx):
+    """Détecte les alertes à la position idx"""
+    ind = precompute_indicators(scenario)
+    current = {
+        'wur': ind['wur'][idx],
+        'inlet_flow_lph': ind['inlet'][idx],
+        'rinse_flow_lph': ind['rinse'][idx],
+        'timestamp': pd.Timestamp(ind['timestamp'][idx])
+    }
+    return detect_alerts(current, ind['inlet_rolling12'][idx])
+
+@st.cache_data(max_entries=512)
+def compute_last_24h_stats(scenario, idx):
+    """Statistiques sur les dernières 24h (288 points) jusqu'à idx"""
+    ind = precompute_indicators(scenario)
+    start = idx - 287
+    return pd.DataFrame({
+        'Indicateur': ['WUR moyen', 'WUR min', 'WUR max', 'Eau totale', 'Production totale'],
+        'Valeur': [
+            f"{ind['wur_24h_mean'][idx]:.2f} L/L",
+            f"{ind['wur_24h_min'][idx]:.2f} L/L",
+            f"{ind['wur_24h_max'][idx]:.2f} L/L",
+            f"{(ind['inlet_cum'][idx + 1] - ind['inlet_cum'][start]) / 1000:.1f} m³",
+            f"{ind['prod_cum'][idx + 1] - ind['prod_cum'][start]:.0f} L"
+        ]
+    })
+
 # ============================================================
 # INITIALISATION SESSION STATE
 # ============================================================
@@ -235,12 +367,6 @@ progress = st.session_state.current_index / total_points
 st.sidebar.progress(progress)
 st.sidebar.caption(f"Point {st.session_state.current_index + 1} / {total_points}")
 
-# ============================================================
-# DONNÉES ACTUELLES (jusqu'à current_index)
-# ============================================================
-
-df_current = df.iloc[:st.session_state.current_index + 1].copy()
-
 # ============================================================
 # HEADER PRINCIPAL
 # ============================================================
@@ -251,211 +377,208 @@ st.markdown(f"**Ligne de production:** PET Casablanca | **Scénario:** {scenario
 st.markdown("---")
 
 # ============================================================
-# KPIs PRINCIPAUX
+# VUE TEMPS RÉEL (fragment)
 # ============================================================
 
-col1, col2, col3, col4 = st.columns(4)
-
-# KPI 1 : WUR actuel
-with col1:
-    current_wur = df_current['wur'].iloc[-1] if len(df_current) > 0 else 0
-    wur_color = "🔴" if current_wur > 1.85 else "🟡" if current_wur > 1.70 else "🟢"
-    st.metric(
-        label="💧 WUR Actuel",
-        value=f"{current_wur:.2f} L/L",
-        delta=f"{wur_color}",
-        delta_color="off"
-    )
-
-# KPI 2 : Eau consommée aujourd'hui
-with col2:
-    if len(df_current) > 0:
-        current_date = df_current['timestamp'].iloc[-1].date()
-        today_data = df_current[df_current['timestamp'].dt.date == current_date]
-        water_today = today_data['inlet_flow_lph'].sum() / 1000
-    else:
-        water_today = 0
+def render_live_view():
+    """
+    KPIs, graphique, alertes et statistiques à la position courante
+    En mode Play, seul ce fragment est ré-exécuté à chaque pas : la sidebar,
+    le CSS et l'en-tête ne sont pas recalculés.
+    """
+    # --- DONNÉES ACTUELLES (jusqu'à current_index) ---
     
-    st.metric(
-        label="🚰 Eau Aujourd'hui",
-        value=f"{water_today:.1f} m³",
-        delta=None
-    )
-
-# KPI 3 : Production aujourd'hui
-with col3:
-    if len(df_current) > 0:
-        prod_today = today_data['production_lph'].sum()
-    else:
-        prod_today = 0
+    # Tranche en lecture seule : pas de copie à chaque rerun
+    df_current = df.iloc[:st.session_state.current_index + 1]
     
-    st.metric(
-        label="🏭 Production Aujourd'hui",
-        value=f"{prod_today:.0f} L",
-        delta=None
-    )
-
-# KPI 4 : Économie potentielle
-with col4:
-    if scenario == "optimized" and len(df_current) > 0:
-        # Comparer avec baseline
-        df_baseline = load_data("baseline")
-        df_baseline_current = df_baseline.iloc[:st.session_state.current_index + 1]
-        baseline_water = df_baseline_current['inlet_flow_lph'].sum() / 1000
-        current_water = df_current['inlet_flow_lph'].sum() / 1000
-        savings = baseline_water - current_water
-        
+    # Position affichée ici aussi : la sidebar n'est pas rafraîchie pendant la lecture
+    st.caption(f"🕐 {df_current['timestamp'].iloc[-1]:%Y-%m-%d %H:%M} | "
+               f"Point {st.session_state.current_index + 1} / {total_points}")
+    
+    # --- KPIs PRINCIPAUX ---
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    kpis = compute_kpis(scenario, st.session_state.current_index)
+    
+    # KPI 1 : WUR actuel
+    with col1:
+        current_wur = kpis['current_wur']
+        wur_color = "🔴" if current_wur > 1.85 else "🟡" if current_wur > 1.70 else "🟢"
         st.metric(
-            label="💰 Économie vs Baseline",
-            value=f"{savings:.1f} m³",
-            delta=f"-{(savings/baseline_water*100):.1f}%",
-            delta_color="normal"
+            label="💧 WUR Actuel",
+            value=f"{current_wur:.2f} L/L",
+            delta=f"{wur_color}",
+            delta_color="off"
         )
-    else:
+    
+    # KPI 2 : Eau consommée aujourd'hui
+    with col2:
         st.metric(
-            label="🎯 WUR Cible",
-            value="1.45 L/L",
+            label="🚰 Eau Aujourd'hui",
+            value=f"{kpis['water_today']:.1f} m³",
             delta=None
         )
-
-st.markdown("---")
-
-# ============================================================
-# GRAPHIQUE TEMPS RÉEL
-# ============================================================
-
-st.markdown("### 📈 Consommation et Production - Temps Réel")
-
-if len(df_current) > 0:
-    # Créer graphique avec dernières 24h (288 points)
-    window_size = min(288, len(df_current))
-    df_window = df_current.iloc[-window_size:]
-    
-    fig = go.Figure()
-    
-    # Ligne inlet
-    fig.add_trace(go.Scatter(
-        x=df_window['timestamp'],
-        y=df_window['inlet_flow_lph'],
-        name='Eau Entrée',
-        line=dict(color='#1f77b4', width=2),
-        fill='tozeroy',
-        fillcolor='rgba(31, 119, 180, 0.1)'
-    ))
-    
-    # Ligne production
-    fig.add_trace(go.Scatter(
-        x=df_window['timestamp'],
-        y=df_window['production_lph'],
-        name='Production',
-        line=dict(color='#2ca02c', width=2)
-    ))
-    
-    # Ligne rinçage
-    fig.add_trace(go.Scatter(
-        x=df_window['timestamp'],
-        y=df_window['rinse_flow_lph'],
-        name='Rinçage',
-        line=dict(color='#ff7f0e', width=1, dash='dot')
-    ))
-    
-    # Marqueurs CIP
-    cip_data = df_window[df_window['cip_active'] == 1]
-    if len(cip_data) > 0:
-        fig.add_trace(go.Scatter(
-            x=cip_data['timestamp'],
-            y=cip_data['inlet_flow_lph'],
-            name='CIP',
-            mode='markers',
-            marker=dict(color='red', size=8, symbol='diamond')
+    
+    # KPI 3 : Production aujourd'hui
+    with col3:
+        st.metric(
+            label="🏭 Production Aujourd'hui",
+            value=f"{kpis['prod_today']:.0f} L",
+            delta=None
+        )
+    
+    # KPI 4 : Économie potentielle
+    with col4:
+        if scenario == "optimized":
+            st.metric(
+                label="💰 Économie vs Baseline",
+                value=f"{kpis['savings']:.1f} m³",
+                delta=f"-{kpis['savings_pct']:.1f}%",
+                delta_color="normal"
+            )
+        else:
+            st.metric(
+                label="🎯 WUR Cible",
+                value="1.45 L/L",
+                delta=None
+            )
+    
+    st.markdown("---")
+    
+    # --- GRAPHIQUE TEMPS RÉEL ---
+    
+    st.markdown("### 📈 Consommation et Production - Temps Réel")
+    
+    if len(df_current) > 0:
+        # Créer graphique avec dernières 24h (288 points)
+        window_size = min(288, len(df_current))
+        df_window = df_current.iloc[-window_size:]
+    
+        # Traces WebGL (Scattergl) : rendu GPU, reste fluide sur de larges fenêtres
+        fig = go.Figure()
+    
+        # Ligne inlet
+        fig.add_trace(go.Scattergl(
+            x=df_window['timestamp'],
+            y=df_window['inlet_flow_lph'],
+            name='Eau Entrée',
+            line=dict(color='#1f77b4', width=2),
+            fill='tozeroy',
+            fillcolor='rgba(31, 119, 180, 0.1)'
         ))
     
-    fig.update_layout(
-        height=400,
-        hovermode='x unified',
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-        xaxis_title="Temps",
-        yaxis_title="Débit (L/h)",
-        template="plotly_white"
-    )
+        # Ligne production
+        fig.add_trace(go.Scattergl(
+            x=df_window['timestamp'],
+            y=df_window['production_lph'],
+            name='Production',
+            line=dict(color='#2ca02c', width=2)
+        ))
     
-    st.plotly_chart(fig, use_container_width=True)
-else:
-    st.info("⏳ En attente de données...")
-
-# ============================================================
-# ALERTES EN TEMPS RÉEL
-# ============================================================
-
-st.markdown("### ⚠️ Alertes et Notifications")
-
-if len(df_current) > 12:  # Au moins 1h de données
-    alerts = detect_alerts(df_current)
+        # Ligne rinçage
+        fig.add_trace(go.Scattergl(
+            x=df_window['timestamp'],
+            y=df_window['rinse_flow_lph'],
+            name='Rinçage',
+            line=dict(color='#ff7f0e', width=1, dash='dot')
+        ))
     
-    if len(alerts) > 0:
-        for alert in alerts:
-            if alert['severity'] == 'HIGH':
-                st.markdown(f'<div class="alert-high">🚨 <strong>{alert["type"]}</strong><br>{alert["message"]}</div>', 
-                           unsafe_allow_html=True)
-            else:
-                st.markdown(f'<div class="alert-medium">⚠️ <strong>{alert["type"]}</strong><br>{alert["message"]}</div>', 
-                           unsafe_allow_html=True)
+        # Marqueurs CIP : positions précalculées, bornées à la fenêtre par recherche binaire
+        ind = precompute_indicators(scenario)
+        idx = st.session_state.current_index
+        cip_idx = ind['cip_idx']
+        cip_window = cip_idx[np.searchsorted(cip_idx, idx - window_size + 1):
+                             np.searchsorted(cip_idx, idx, side='right')]
+        if len(cip_window) > 0:
+            fig.add_trace(go.Scattergl(
+                x=ind['timestamp'][cip_window],
+                y=ind['inlet'][cip_window],
+                name='CIP',
+                mode='markers',
+                marker=dict(color='red', size=8, symbol='diamond')
+            ))
+    
+        fig.update_layout(
+            height=400,
+            hovermode='x unified',
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+            xaxis_title="Temps",
+            yaxis_title="Débit (L/h)",
+            template="plotly_white"
+        )
+    
+        st.plotly_chart(fig, use_container_width=True)
     else:
-        st.markdown('<div class="success-box">✅ Aucune alerte - Fonctionnement normal</div>', 
-                   unsafe_allow_html=True)
-else:
-    st.info("ℹ️ Collecte de données en cours... (minimum 1h requis pour détection)")
-
-# ============================================================
-# STATISTIQUES RÉCENTES
-# ============================================================
-
-col1, col2 = st.columns(2)
-
-with col1:
-    st.markdown("#### 📊 Statistiques dernières 24h")
-    if len(df_current) >= 288:
-        last_24h = df_current.iloc[-288:]
-        stats_df = pd.DataFrame({
-            'Indicateur': ['WUR moyen', 'WUR min', 'WUR max', 'Eau totale', 'Production totale'],
+        st.info("⏳ En attente de données...")
+    
+    # --- ALERTES EN TEMPS RÉEL ---
+    
+    st.markdown("### ⚠️ Alertes et Notifications")
+    
+    if len(df_current) > 12:  # Au moins 1h de données
+        alerts = compute_alerts(scenario, st.session_state.current_index)
+    
+        if len(alerts) > 0:
+            for alert in alerts:
+                if alert['severity'] == 'HIGH':
+                    st.markdown(f'<div class="alert-high">🚨 <strong>{alert["type"]}</strong><br>{alert["message"]}</div>', 
+                               unsafe_allow_html=True)
+                else:
+                    st.markdown(f'<div class="alert-medium">⚠️ <strong>{alert["type"]}</strong><br>{alert["message"]}</div>', 
+                               unsafe_allow_html=True)
+        else:
+            st.markdown('<div class="success-box">✅ Aucune alerte - Fonctionnement normal</div>', 
+                       unsafe_allow_html=True)
+    else:
+        st.info("ℹ️ Collecte de données en cours... (minimum 1h requis pour détection)")
+    
+    # --- STATISTIQUES RÉCENTES ---
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("#### 📊 Statistiques dernières 24h")
+        if len(df_current) >= 288:
+            stats_df = compute_last_24h_stats(scenario, st.session_state.current_index)
+            st.dataframe(stats_df, use_container_width=True, hide_index=True)
+        else:
+            st.info("⏳ Données insuffisantes (< 24h)")
+    
+    with col2:
+        st.markdown("#### 🎯 Comparaison avec Objectifs")
+        target_wur = 1.45
+        current_avg_wur = kpis['avg_wur']
+        gap = current_avg_wur - target_wur
+    
+        comparison_df = pd.DataFrame({
+            'Métrique': ['WUR Actuel', 'WUR Cible', 'Écart'],
             'Valeur': [
-                f"{last_24h['wur'].mean():.2f} L/L",
-                f"{last_24h['wur'].min():.2f} L/L",
-                f"{last_24h['wur'].max():.2f} L/L",
-                f"{last_24h['inlet_flow_lph'].sum() / 1000:.1f} m³",
-                f"{last_24h['production_lph'].sum():.0f} L"
+                f"{current_avg_wur:.2f} L/L",
+                f"{target_wur:.2f} L/L",
+                f"{gap:+.2f} L/L ({'🔴' if gap > 0 else '🟢'})"
             ]
         })
-        st.dataframe(stats_df, use_container_width=True, hide_index=True)
-    else:
-        st.info("⏳ Données insuffisantes (< 24h)")
-
-with col2:
-    st.markdown("#### 🎯 Comparaison avec Objectifs")
-    target_wur = 1.45
-    current_avg_wur = df_current['wur'].mean() if len(df_current) > 0 else 0
-    gap = current_avg_wur - target_wur
+        st.dataframe(comparison_df, use_container_width=True, hide_index=True)
     
-    comparison_df = pd.DataFrame({
-        'Métrique': ['WUR Actuel', 'WUR Cible', 'Écart'],
-        'Valeur': [
-            f"{current_avg_wur:.2f} L/L",
-            f"{target_wur:.2f} L/L",
-            f"{gap:+.2f} L/L ({'🔴' if gap > 0 else '🟢'})"
-        ]
-    })
-    st.dataframe(comparison_df, use_container_width=True, hide_index=True)
+    # Avancer d'un pas : affiché au prochain rafraîchissement du fragment
+    if st.session_state.is_playing:
+        if st.session_state.current_index < total_points - 1:
+            st.session_state.current_index += 1
+        else:
+            # Fin des données : arrêter la lecture et relancer l'app pour supprimer le minuteur
+            st.session_state.is_playing = False
+            st.rerun(scope="app")
 
 # ============================================================
 # AUTO-REFRESH (mode Play)
 # ============================================================
 
-if st.session_state.is_playing and st.session_state.current_index < total_points - 1:
-    # Calculer le délai en fonction de la vitesse
-    delay = 0.5 / st.session_state.playback_speed
-    time.sleep(delay)
-    st.session_state.current_index += 1
-    st.rerun()
+# Délai entre deux pas en fonction de la vitesse (rafraîchissement côté fragment)
+delay = 0.5 / st.session_state.playback_speed
+playing = st.session_state.is_playing and st.session_state.current_index < total_points - 1
+live_view = st.fragment(run_every=delay if playing else None)(render_live_view)
+live_view()
 
 # ============================================================
 # FOOTER
@@ -2,10 +2,14 @@
 AquaTrack MVP - Générateur de données synthétiques
 ===================================================
 
-Ce script génère 3 datasets CSV pour le MVP :
-1. baseline.csv : Situation actuelle (WUR = 1.65)
-2. anomaly.csv : Avec anomalies (fuites, sur-rinçage)
-3. optimized.csv : Après optimisations (WUR = 1.33)
+Ce script génère 3 datasets Parquet pour le MVP :
+1. baseline.parquet : Situation actuelle (WUR = 1.65)
+2. anomaly.parquet : Avec anomalies (fuites, sur-rinçage)
+3. optimized.parquet : Après optimisations (WUR = 1.33)
+
+Les CSV correspondants sont écrits si EXPORT_CSV est activé, ou si pyarrow
+n'est pas installé. Les mesures sont stockées en float32 : les CSV les écrivent
+avec la plus courte représentation float32 (ex. 1439.8301 pour un total calculé).
 
 Auteur: AquaTrack Team
 Date: Décembre 2024
@@ -14,11 +18,19 @@ Date: Décembre 2024
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import random
+import io
+import sys
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pa_parquet
+except ImportError:  # pyarrow optionnel : repli sur les écrivains pandas
+    pa = None
 
 # Configuration de la génération aléatoire (reproductibilité)
-np.random.seed(42)
-random.seed(42)
+# Graine locale à chaque génération (np.random.Generator) : pas d'état global partagé
+RANDOM_SEED = 42
 
 # ============================================================
 # PARAMÈTRES GLOBAUX
@@ -55,29 +67,64 @@ TEMPERATURE_STD = 2
 # Bruit de mesure (réalisme capteurs)
 NOISE_FACTOR = 0.05  # ±5%
 
+# Export : Parquet uniquement ; activer pour écrire aussi le CSV lisible
+# (le CSV est toujours écrit si pyarrow est absent)
+EXPORT_CSV = False
+
+# Libellés des colonnes catégorielles (stockées en codes entiers)
+# Ordre alphabétique, comme pd.Categorical sur les libellés : mêmes catégories à la relecture
+SHIFT_LABELS = ["afternoon", "morning", "night"]
+LINE_STATUS_LABELS = ["running", "stopped"]
+
 # ============================================================
 # FONCTIONS AUXILIAIRES
 # ============================================================
 
-def add_noise(value, factor=NOISE_FACTOR):
-    """Ajoute du bruit gaussien pour simuler variabilité capteurs"""
-    return value * (1 + np.random.normal(0, factor))
+def add_noise(rng, values, factor=NOISE_FACTOR):
+    """Ajoute du bruit gaussien pour simuler variabilité capteurs (vectorisé)"""
+    values = np.asarray(values, dtype=float)
+    return values * (1 + factor * rng.standard_normal(values.shape))
 
-def get_shift(hour):
-    """Détermine l'équipe selon l'heure"""
-    if 6 <= hour < 14:
-        return "morning"
-    elif 14 <= hour < 22:
-        return "afternoon"
-    else:
-        return "night"
+def get_shift(hours):
+    """Détermine le code d'équipe selon l'heure (indice dans SHIFT_LABELS)"""
+    night_mask = (hours < 6) | (hours >= 22)
+    return np.where(night_mask, 2, np.where(hours < 14, 1, 0)).astype(np.int8)
 
-def is_cip_time(timestamp, cip_schedule):
-    """Vérifie si un CIP est en cours à ce timestamp"""
-    for cip_start, cip_end in cip_schedule:
-        if cip_start <= timestamp < cip_end:
-            return True
-    return False
+def in_time_windows(timestamps, windows):
+    """
+    Indique pour chaque timestamp s'il tombe dans une fenêtre [début, fin[
+    Les fenêtres (triées, disjointes) sont aplaties en bornes successives :
+    un indice de recherche impair signifie que le timestamp est à l'intérieur.
+    """
+    timestamps = np.asarray(timestamps)
+    bounds = np.array([t for window in windows for t in window], dtype='datetime64[ns]')
+    bounds = bounds.astype(timestamps.dtype)
+    return (np.searchsorted(bounds, timestamps, side='right') & 1).astype(bool)
+
+def is_cip_time(timestamps, cip_schedule):
+    """Indique pour chaque timestamp si un CIP est en cours"""
+    return in_time_windows(timestamps, cip_schedule)
+
+def compute_wur(inlet_flow, production):
+    """WUR = eau entrante / production (0 si production nulle), divisé directement dans le tableau résultat"""
+    wur = np.zeros_like(inlet_flow)
+    return np.divide(inlet_flow, production, out=wur, where=production > 0)
+
+def float32_frame(columns):
+    """
+    Construit un DataFrame de mesures float32 à partir de {nom: (valeurs, décimales)}
+    Les colonnes sont arrondies directement dans un bloc (k, N) préalloué : chaque
+    colonne est une ligne contiguë du bloc, que le DataFrame enveloppe sans recopie.
+    """
+    block = np.empty((len(columns), TOTAL_POINTS), dtype=np.float32)
+    for row, (values, decimals) in zip(block, columns.values()):
+        np.round(values, decimals, out=row)
+    return pd.DataFrame(block.T, columns=list(columns), copy=False)
+
+def idx_range(start, end):
+    """Plage d'indices [start, end[ sur la grille régulière des timestamps"""
+    step = timedelta(minutes=INTERVAL_MINUTES)
+    return slice((start - START_DATE) // step, (end - START_DATE) // step)
 
 def generate_cip_schedule(start_date, days, frequency_days=CIP_FREQUENCY_DAYS):
     """Génère le planning des CIP (Clean-In-Place)"""
@@ -100,99 +147,78 @@ def generate_cip_schedule(start_date, days, frequency_days=CIP_FREQUENCY_DAYS):
 # GÉNÉRATION DATASET BASELINE
 # ============================================================
 
-def generate_baseline_data():
+def generate_baseline_data(rng=None):
     """
     Génère le dataset BASELINE (situation actuelle)
     WUR cible : 1.65 L/L
+    rng : np.random.Generator (par défaut, générateur initialisé avec RANDOM_SEED)
     """
     print("🔄 Génération du dataset BASELINE...")
     
+    if rng is None:
+        rng = np.random.default_rng(RANDOM_SEED)
+    
     # Timestamps
-    timestamps = [START_DATE + timedelta(minutes=INTERVAL_MINUTES * i) 
-                  for i in range(TOTAL_POINTS)]
+    timestamps = pd.date_range(START_DATE, periods=TOTAL_POINTS, freq=f'{INTERVAL_MINUTES}min', unit='ns')
+    hours = timestamps.hour.to_numpy()
     
     # Planning CIP
     cip_schedule = generate_cip_schedule(START_DATE, DAYS)
     print(f"   📅 {len(cip_schedule)} événements CIP planifiés")
     
-    data = {
-        'timestamp': [],
-        'scenario': [],
-        'inlet_flow_lph': [],
-        'post_treatment_flow_lph': [],
-        'rinse_flow_lph': [],
-        'cip_flow_lph': [],
-        'production_lph': [],
-        'conductivity_uS_cm': [],
-        'turbidity_NTU': [],
-        'temperature_C': [],
-        'cip_active': [],
-        'shift': [],
-        'line_status': [],
-        'wur': []
-    }
-    
-    for ts in timestamps:
-        hour = ts.hour
-        shift = get_shift(hour)
-        
-        # Production (réduite la nuit)
-        if shift == "night":
-            production = PRODUCTION_NOMINAL * PRODUCTION_NIGHT_FACTOR
-        else:
-            production = PRODUCTION_NOMINAL
-        production = add_noise(production, 0.03)
-        
-        # CIP en cours ?
-        cip_active = is_cip_time(ts, cip_schedule)
-        
-        if cip_active:
-            # Pendant CIP : forte consommation d'eau, production réduite
-            cip_flow = CIP_FLOW_RATE
-            inlet_flow = INLET_FLOW_BASE + cip_flow
-            rinse_flow = RINSE_FLOW_BASE * 0.5  # Rinçage réduit pendant CIP
-            production = production * 0.8  # Production ralentie
-        else:
-            cip_flow = 0
-            inlet_flow = INLET_FLOW_BASE
-            rinse_flow = RINSE_FLOW_BASE
-        
-        # Ajouter bruit réaliste
-        inlet_flow = add_noise(inlet_flow, 0.04)
-        rinse_flow = add_noise(rinse_flow, 0.06)
-        
-        # Post-traitement (pertes selon %)
-        post_treatment_flow = inlet_flow * (1 - TREATMENT_LOSS_PCT / 100)
-        post_treatment_flow = add_noise(post_treatment_flow, 0.03)
-        
-        # Qualité eau
-        conductivity = add_noise(CONDUCTIVITY_MEAN, 0.02)
-        turbidity = max(0.1, add_noise(TURBIDITY_MEAN, 0.15))
-        temperature = add_noise(TEMPERATURE_MEAN, 0.05)
-        
-        # WUR
-        wur = inlet_flow / production if production > 0 else 0
-        
-        # État ligne
-        line_status = "running" if production > 500 else "stopped"
-        
-        # Ajouter au dataset
-        data['timestamp'].append(ts)
-        data['scenario'].append('baseline')
-        data['inlet_flow_lph'].append(round(inlet_flow, 2))
-        data['post_treatment_flow_lph'].append(round(post_treatment_flow, 2))
-        data['rinse_flow_lph'].append(round(rinse_flow, 2))
-        data['cip_flow_lph'].append(round(cip_flow, 2))
-        data['production_lph'].append(round(production, 2))
-        data['conductivity_uS_cm'].append(round(conductivity, 2))
-        data['turbidity_NTU'].append(round(turbidity, 2))
-        data['temperature_C'].append(round(temperature, 1))
-        data['cip_active'].append(1 if cip_active else 0)
-        data['shift'].append(shift)
-        data['line_status'].append(line_status)
-        data['wur'].append(round(wur, 3))
-    
-    df = pd.DataFrame(data)
+    shift_codes = get_shift(hours)
+    night_mask = shift_codes == 2
+    
+    # Production (réduite la nuit)
+    production = np.where(night_mask, PRODUCTION_NOMINAL * PRODUCTION_NIGHT_FACTOR, PRODUCTION_NOMINAL)
+    production = add_noise(rng, production, 0.03)
+    
+    # CIP en cours ?
+    cip_active = is_cip_time(timestamps, cip_schedule)
+    
+    # Pendant CIP : forte consommation d'eau, rinçage réduit, production ralentie
+    cip_flow = np.where(cip_active, CIP_FLOW_RATE, 0)
+    inlet_flow = INLET_FLOW_BASE + cip_flow
+    rinse_flow = np.where(cip_active, RINSE_FLOW_BASE * 0.5, RINSE_FLOW_BASE)
+    production = np.where(cip_active, production * 0.8, production)
+    
+    # Ajouter bruit réaliste
+    inlet_flow = add_noise(rng, inlet_flow, 0.04)
+    rinse_flow = add_noise(rng, rinse_flow, 0.06)
+    
+    # Post-traitement (pertes selon %)
+    post_treatment_flow = inlet_flow * (1 - TREATMENT_LOSS_PCT / 100)
+    post_treatment_flow = add_noise(rng, post_treatment_flow, 0.03)
+    
+    # Qualité eau
+    conductivity = add_noise(rng, np.full(TOTAL_POINTS, CONDUCTIVITY_MEAN), 0.02)
+    turbidity = np.maximum(0.1, add_noise(rng, np.full(TOTAL_POINTS, TURBIDITY_MEAN), 0.15))
+    temperature = add_noise(rng, np.full(TOTAL_POINTS, TEMPERATURE_MEAN), 0.05)
+    
+    # WUR
+    wur = compute_wur(inlet_flow, production)
+    
+    # État ligne
+    line_status_codes = (production <= 500).astype(np.int8)
+    
+    # Colonnes construites aux types finaux : mesures dans un seul bloc float32 contigu,
+    # puis colonnes non numériques insérées à leur place
+    df = float32_frame({
+        'inlet_flow_lph': (inlet_flow, 2),
+        'post_treatment_flow_lph': (post_treatment_flow, 2),
+        'rinse_flow_lph': (rinse_flow, 2),
+        'cip_flow_lph': (cip_flow, 2),
+        'production_lph': (production, 2),
+        'conductivity_uS_cm': (conductivity, 2),
+        'turbidity_NTU': (turbidity, 2),
+        'temperature_C': (temperature, 1),
+        'wur': (wur, 3)
+    })
+    df.insert(0, 'timestamp', timestamps)
+    df.insert(1, 'scenario', 'baseline')
+    df.insert(10, 'cip_active', cip_active.astype(np.int8))
+    df.insert(11, 'shift', pd.Categorical.from_codes(shift_codes, SHIFT_LABELS))
+    df.insert(12, 'line_status', pd.Categorical.from_codes(line_status_codes, LINE_STATUS_LABELS))
     
     # Statistiques
     avg_wur = df['wur'].mean()
@@ -209,9 +235,9 @@ def generate_baseline_data():
 # GÉNÉRATION DATASET AVEC ANOMALIES
 # ============================================================
 
-def generate_anomaly_data():
+def generate_anomaly_data(df_baseline):
     """
-    Génère le dataset ANOMALY (avec anomalies)
+    Génère le dataset ANOMALY (avec anomalies) à partir du baseline
     Anomalies injectées :
     - Jour 16 : Fuite (+20% débit)
     - Jour 22 : Sur-rinçage (+50% durée)
@@ -219,41 +245,44 @@ def generate_anomaly_data():
     """
     print("\n🔄 Génération du dataset ANOMALY...")
     
-    # Partir du baseline
-    df = generate_baseline_data()
+    # Partir du baseline (copie : le dataset d'origine reste intact)
+    df = df_baseline.copy()
     df['scenario'] = 'anomaly'
     
+    # Grille régulière : chaque fenêtre d'anomalie est une tranche d'indices
+    col = df.columns.get_loc
+    
     # ANOMALIE 1 : Fuite jour 16, 14h00-22h00
     leak_start = START_DATE + timedelta(days=15, hours=14)
     leak_end = START_DATE + timedelta(days=15, hours=22)
-    leak_mask = (df['timestamp'] >= leak_start) & (df['timestamp'] < leak_end)
+    leak = idx_range(leak_start, leak_end)
     
-    df.loc[leak_mask, 'inlet_flow_lph'] *= 1.20  # +20% débit
+    df.iloc[leak, col('inlet_flow_lph')] *= 1.20  # +20% débit
     print(f"   ⚠️  ANOMALIE 1 : Fuite injectée (jour 16, 14h-22h, +20% débit)")
     
     # ANOMALIE 2 : Sur-rinçage jour 22, 09h00-17h00
     overrinse_start = START_DATE + timedelta(days=21, hours=9)
     overrinse_end = START_DATE + timedelta(days=21, hours=17)
-    overrinse_mask = (df['timestamp'] >= overrinse_start) & (df['timestamp'] < overrinse_end)
+    overrinse = idx_range(overrinse_start, overrinse_end)
     
-    df.loc[overrinse_mask, 'rinse_flow_lph'] *= 1.50  # +50% rinçage
-    df.loc[overrinse_mask, 'inlet_flow_lph'] += df.loc[overrinse_mask, 'rinse_flow_lph'] * 0.3
+    df.iloc[overrinse, col('rinse_flow_lph')] *= 1.50  # +50% rinçage
+    df.iloc[overrinse, col('inlet_flow_lph')] += df.iloc[overrinse, col('rinse_flow_lph')] * 0.3
     print(f"   ⚠️  ANOMALIE 2 : Sur-rinçage (jour 22, 09h-17h, +50% débit)")
     
     # ANOMALIE 3 : CIP non planifié jour 28, 15h30
     unplanned_cip_start = START_DATE + timedelta(days=27, hours=15, minutes=30)
     unplanned_cip_end = unplanned_cip_start + timedelta(hours=CIP_DURATION_HOURS)
-    unplanned_cip_mask = (df['timestamp'] >= unplanned_cip_start) & (df['timestamp'] < unplanned_cip_end)
+    unplanned_cip = idx_range(unplanned_cip_start, unplanned_cip_end)
     
-    df.loc[unplanned_cip_mask, 'cip_flow_lph'] = CIP_FLOW_RATE
-    df.loc[unplanned_cip_mask, 'cip_active'] = 1
-    df.loc[unplanned_cip_mask, 'inlet_flow_lph'] += CIP_FLOW_RATE
-    df.loc[unplanned_cip_mask, 'production_lph'] *= 0.8
+    df.iloc[unplanned_cip, col('cip_flow_lph')] = CIP_FLOW_RATE
+    df.iloc[unplanned_cip, col('cip_active')] = 1
+    df.iloc[unplanned_cip, col('inlet_flow_lph')] += CIP_FLOW_RATE
+    df.iloc[unplanned_cip, col('production_lph')] *= 0.8
     print(f"   ⚠️  ANOMALIE 3 : CIP non planifié (jour 28, 15h30)")
     
     # Recalculer WUR
-    df['wur'] = df['inlet_flow_lph'] / df['production_lph']
-    df['wur'] = df['wur'].round(3)
+    wur = compute_wur(df['inlet_flow_lph'].to_numpy(), df['production_lph'].to_numpy())
+    df['wur'] = np.round(wur, 3, out=wur)
     
     # Statistiques
     avg_wur = df['wur'].mean()
@@ -265,9 +294,9 @@ def generate_anomaly_data():
 # GÉNÉRATION DATASET OPTIMISÉ
 # ============================================================
 
-def generate_optimized_data():
+def generate_optimized_data(df_baseline):
     """
-    Génère le dataset OPTIMIZED (situation optimisée)
+    Génère le dataset OPTIMIZED (situation optimisée) à partir du baseline
     Optimisations appliquées :
     - Réduction rinçage : -25%
     - Amélioration traitement : pertes 15% → 12%
@@ -276,8 +305,8 @@ def generate_optimized_data():
     """
     print("\n🔄 Génération du dataset OPTIMIZED...")
     
-    # Partir du baseline
-    df = generate_baseline_data()
+    # Partir du baseline (copie : le dataset d'origine reste intact)
+    df = df_baseline.copy()
     df['scenario'] = 'optimized'
     
     # OPTIMISATION 1 : Réduction rinçage -25%
@@ -302,8 +331,8 @@ def generate_optimized_data():
     df['inlet_flow_lph'] *= 0.90
     
     # Recalculer WUR
-    df['wur'] = df['inlet_flow_lph'] / df['production_lph']
-    df['wur'] = df['wur'].round(3)
+    wur = compute_wur(df['inlet_flow_lph'].to_numpy(), df['production_lph'].to_numpy())
+    df['wur'] = np.round(wur, 3, out=wur)
     
     # Statistiques
     avg_wur = df['wur'].mean()
@@ -328,14 +357,16 @@ def validate_dataset(df, scenario_name):
     errors = []
     warnings = []
     
-    # Test 1 : Plages de valeurs
-    if (df['wur'] < 1.0).any() or (df['wur'] > 3.0).any():
+    # Test 1 : Plages de valeurs (min/max des colonnes contrôlées en un seul appel)
+    extremes = df[['wur', 'production_lph', 'conductivity_uS_cm']].agg(['min', 'max'])
+    
+    if extremes.at['min', 'wur'] < 1.0 or extremes.at['max', 'wur'] > 3.0:
         errors.append(f"WUR hors plage [1.0, 3.0] détecté")
     
-    if (df['production_lph'] < 0).any() or (df['production_lph'] > 1500).any():
+    if extremes.at['min', 'production_lph'] < 0 or extremes.at['max', 'production_lph'] > 1500:
         errors.append(f"Production hors plage [0, 1500] détectée")
     
-    if (df['conductivity_uS_cm'] < 100).any() or (df['conductivity_uS_cm'] > 400).any():
+    if extremes.at['min', 'conductivity_uS_cm'] < 100 or extremes.at['max', 'conductivity_uS_cm'] > 400:
         warnings.append(f"Conductivité hors plage typique [100, 400]")
     
     # Test 2 : Bilan de masse approximatif
@@ -347,7 +378,7 @@ def validate_dataset(df, scenario_name):
         warnings.append(f"{high_error} points avec erreur bilan de masse > 30%")
     
     # Test 3 : Valeurs manquantes
-    if df.isnull().sum().sum() > 0:
+    if df.isna().to_numpy().any():
         errors.append(f"Valeurs manquantes détectées")
     
     # Résultats
@@ -366,14 +397,38 @@ def validate_dataset(df, scenario_name):
     return len(errors) == 0
 
 # ============================================================
-# EXPORT CSV
+# EXPORT DES DATASETS
 # ============================================================
 
-def export_to_csv(df, filename):
-    """Exporte le dataframe en CSV"""
-    df.to_csv(filename, index=False, date_format='%Y-%m-%d %H:%M:%S')
+def export_dataset(df, name):
+    """Exporte le dataframe en Parquet ({name}.parquet), et en CSV si demandé ou si pyarrow est absent"""
+    filename = f"{name}.csv"
+    parquet_filename = f"{name}.parquet"
+    
+    if pa is not None:
+        # Conversion Arrow unique, partagée par les deux écrivains C++
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        
+        # CSV : timestamp ramené à la seconde ('%Y-%m-%d %H:%M:%S'), sans guillemets comme df.to_csv
+        if EXPORT_CSV:
+            ts_index = table.schema.get_field_index('timestamp')
+            csv_table = table.set_column(ts_index, 'timestamp', table['timestamp'].cast(pa.timestamp('s')))
+            options = pa_csv.WriteOptions(quoting_style='none', quoting_header='none')
+            pa_csv.write_csv(csv_table, filename, options)
+        
+        # Parquet compressé zstd : colonnes typées (timestamp natif, catégories),
+        # fichier plus petit et lu bien plus vite par le dashboard
+        pa_parquet.write_table(table, parquet_filename, compression='zstd', compression_level=3)
+    else:
+        df.to_csv(filename, index=False, date_format='%Y-%m-%d %H:%M:%S')
+    
     file_size = len(df) * df.memory_usage(deep=True).sum() / 1024 / 1024
-    print(f"   💾 Exporté : {filename} ({len(df)} lignes, ~{file_size:.2f} MB)")
+    if EXPORT_CSV or pa is None:
+        print(f"   💾 Exporté : {filename} ({len(df)} lignes, ~{file_size:.2f} MB)")
+    if pa is not None:
+        print(f"   💾 Exporté : {parquet_filename}")
+    else:
+        print(f"   ⚠️  pyarrow non installé : {parquet_filename} non généré")
 
 # ============================================================
 # STATISTIQUES RÉCAPITULATIVES
@@ -381,59 +436,51 @@ def export_to_csv(df, filename):
 
 def print_summary_stats(df_baseline, df_anomaly, df_optimized):
     """Affiche un tableau récapitulatif des 3 scénarios"""
-    print("\n" + "="*70)
-    print("📊 RÉCAPITULATIF DES 3 SCÉNARIOS")
-    print("="*70)
-    
-    scenarios = [
-        ("BASELINE", df_baseline),
-        ("ANOMALY", df_anomaly),
-        ("OPTIMIZED", df_optimized)
-    ]
-    
-    print(f"\n{'Indicateur':<30} {'Baseline':<15} {'Anomaly':<15} {'Optimized':<15}")
-    print("-" * 75)
-    
-    for label, df in scenarios:
-        wur = df['wur'].mean()
-        water = df['inlet_flow_lph'].sum() / 1000
-        prod = df['production_lph'].sum() / 1000
-        
-        if label == "BASELINE":
-            baseline_wur = wur
-            baseline_water = water
-    
-    # WUR
-    print(f"{'WUR moyen (L/L)':<30} "
-          f"{df_baseline['wur'].mean():<15.3f} "
-          f"{df_anomaly['wur'].mean():<15.3f} "
-          f"{df_optimized['wur'].mean():<15.3f}")
-    
-    # Eau totale
-    print(f"{'Eau totale (m³)':<30} "
-          f"{df_baseline['inlet_flow_lph'].sum()/1000:<15.1f} "
-          f"{df_anomaly['inlet_flow_lph'].sum()/1000:<15.1f} "
-          f"{df_optimized['inlet_flow_lph'].sum()/1000:<15.1f}")
-    
-    # Production
-    print(f"{'Production (m³)':<30} "
-          f"{df_baseline['production_lph'].sum()/1000:<15.1f} "
-          f"{df_anomaly['production_lph'].sum()/1000:<15.1f} "
-          f"{df_optimized['production_lph'].sum()/1000:<15.1f}")
-    
-    # Économie vs baseline
-    baseline_water = df_baseline['inlet_flow_lph'].sum() / 1000
-    optimized_water = df_optimized['inlet_flow_lph'].sum() / 1000
+    # Frame long empilant les 3 scénarios, étiquetés selon leur position d'argument :
+    # une seule agrégation groupby sur la colonne 'scenario'
+    # (pas de NaN après validation ; valeurs passées en float64 : pas de perte de précision sur TOTAL_POINTS valeurs)
+    frames = {'Baseline': df_baseline, 'Anomaly': df_anomaly, 'Optimized': df_optimized}
+    values = ['wur', 'inlet_flow_lph', 'production_lph']
+    combined = pd.concat([df[values].astype(np.float64).assign(scenario=label) for label, df in frames.items()],
+                         ignore_index=True)
+    stats = combined.groupby('scenario', sort=False).agg(
+        wur=('wur', 'mean'),
+        water=('inlet_flow_lph', 'sum'),
+        prod=('production_lph', 'sum')
+    )
+    stats[['water', 'prod']] /= 1000
+    
+    # Économie vs baseline (volumes déjà agrégés ci-dessus)
+    baseline_water = stats.at['Baseline', 'water']
+    optimized_water = stats.at['Optimized', 'water']
     savings = baseline_water - optimized_water
     savings_pct = (savings / baseline_water) * 100
     
-    print("-" * 75)
-    print(f"{'Économie optimisé vs baseline':<30} "
-          f"-- "
-          f"{'':15} "
-          f"{savings:.1f} m³ (-{savings_pct:.1f}%)")
-    
-    print("="*70 + "\n")
+    # Tableau indicateurs × scénarios et ligne d'économie rendus ensemble en un seul appel
+    # (précision propre à chaque indicateur, colonnes alignées sur toutes les lignes)
+    results = stats.T.set_axis(['WUR moyen (L/L)', 'Eau totale (m³)', 'Production (m³)'])
+    results = results.rename_axis(columns='Indicateur')
+    formats = {'WUR moyen (L/L)': '{:.3f}', 'Eau totale (m³)': '{:.1f}', 'Production (m³)': '{:.1f}'}
+    table = results.apply(lambda row: row.map(formats[row.name].format), axis=1)
+    table.loc['Économie optimisé vs baseline'] = ['--', '', f"{savings:.1f} m³ ({-savings_pct:.1f}%)"]
+    header, *rows, savings_row = table.to_string(col_space=15).splitlines()
+    separator = "-" * len(header)
+    
+    # Récapitulatif assemblé en mémoire puis écrit en une seule fois
+    buf = io.StringIO()
+    print("\n" + "="*70, file=buf)
+    print("📊 RÉCAPITULATIF DES 3 SCÉNARIOS", file=buf)
+    print("="*70, file=buf)
+    
+    print(f"\n{header}", file=buf)
+    print(separator, file=buf)
+    print("\n".join(rows), file=buf)
+    
+    print(separator, file=buf)
+    print(savings_row, file=buf)
+    
+    print("="*70 + "\n", file=buf)
+    sys.stdout.write(buf.getvalue())
 
 # ============================================================
 # FONCTION PRINCIPALE
@@ -441,17 +488,20 @@ def print_summary_stats(df_baseline, df_anomaly, df_optimized):
 
 def main():
     """Fonction principale - Génère les 3 datasets"""
-    print("\n" + "="*70)
-    print("🚀 AQUATRACK MVP - GÉNÉRATEUR DE DONNÉES SYNTHÉTIQUES")
-    print("="*70)
-    print(f"📅 Période : {DAYS} jours ({TOTAL_POINTS} points)")
-    print(f"⏱️  Résolution : {INTERVAL_MINUTES} minutes")
-    print("="*70 + "\n")
+    # En-tête et bilan final : chacun assemblé en mémoire puis écrit en une seule fois
+    buf = io.StringIO()
+    print("\n" + "="*70, file=buf)
+    print("🚀 AQUATRACK MVP - GÉNÉRATEUR DE DONNÉES SYNTHÉTIQUES", file=buf)
+    print("="*70, file=buf)
+    print(f"📅 Période : {DAYS} jours ({TOTAL_POINTS} points)", file=buf)
+    print(f"⏱️  Résolution : {INTERVAL_MINUTES} minutes", file=buf)
+    print("="*70 + "\n", file=buf)
+    sys.stdout.write(buf.getvalue())
     
     # Générer les 3 datasets
     df_baseline = generate_baseline_data()
-    df_anomaly = generate_anomaly_data()
-    df_optimized = generate_optimized_data()
+    df_anomaly = generate_anomaly_data(df_baseline)
+    df_optimized = generate_optimized_data(df_baseline)
     
     # Valider
     validate_dataset(df_baseline, "baseline")
@@ -459,20 +509,22 @@ def main():
     validate_dataset(df_optimized, "optimized")
     
     # Exporter
-    print("\n📦 Export des fichiers CSV...")
-    export_to_csv(df_baseline, "baseline.csv")
-    export_to_csv(df_anomaly, "anomaly.csv")
-    export_to_csv(df_optimized, "optimized.csv")
+    print("\n📦 Export des fichiers Parquet/CSV...")
+    export_dataset(df_baseline, "baseline")
+    export_dataset(df_anomaly, "anomaly")
+    export_dataset(df_optimized, "optimized")
     
     # Statistiques finales
     print_summary_stats(df_baseline, df_anomaly, df_optimized)
     
-    print("✅ Génération terminée avec succès !")
-    print("\n📁 Fichiers générés :")
-    print("   - baseline.csv")
-    print("   - anomaly.csv")
-    print("   - optimized.csv")
-    print("\n💡 Prochaine étape : Charger ces fichiers dans le dashboard\n")
+    buf = io.StringIO()
+    print("✅ Génération terminée avec succès !", file=buf)
+    print("\n📁 Fichiers générés :", file=buf)
+    formats = [ext for ext, written in (("csv", EXPORT_CSV or pa is None), ("parquet", pa is not None)) if written]
+    for name in ("baseline", "anomaly", "optimized"):
+        print(f"   - {', '.join(f'{name}.{ext}' for ext in formats)}", file=buf)
+    print("\n💡 Prochaine étape : Charger ces fichiers dans le dashboard\n", file=buf)
+    sys.stdout.write(buf.getvalue())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file